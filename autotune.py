@@ -0,0 +1,573 @@
+# autotune.py
+"""
+CPU inference autotuner for the llama.cpp LLM and the SentenceTransformer embedder.
+
+Sweeps llama.cpp settings (threads, batch size, mmap/mlock, context window) and
+the embedding encode batch size on the current machine with a fixed prompt set,
+then writes a host profile that rag_pipeline.py / indexing.py load at startup.
+
+Measured per trial (each trial runs in a fresh process so peak RSS is per-config):
+- prefill tokens/sec, decode tokens/sec, peak RSS  (LLM)
+- sentences/sec, peak RSS                         (embedder)
+
+Usage:
+    python autotune.py                       # full sweep, writes host_profile.json
+    python autotune.py --repeats 3 --latency-budget 45
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from prompt_config import prompt_char_limit
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+HOST_PROFILE_PATH = "host_profile.json"
+MODEL_PATH = "models/tinyllama-1.1b-chat-v1.0.Q4_0.gguf"
+EMBED_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Values the pipeline used before profiles existed (also the fallback when no profile matches)
+DEFAULT_CONTEXT_WINDOW = 2048
+DEFAULT_MAX_NEW_TOKENS = 512
+
+# Sweep settings
+CONTEXT_WINDOW_CANDIDATES = [2048, 4096]
+N_BATCH_CANDIDATES = [64, 128, 256, 512]
+EMBED_BATCH_CANDIDATES = [8, 16, 32, 64, 128, 256]
+DECODE_TOKENS = 64             # tokens generated per timed prompt
+REFERENCE_ANSWER_TOKENS = 256  # answer length used to score configs (seconds / request)
+MIN_NEW_TOKENS = 128           # floor when --latency-budget lowers max_new_tokens
+MAX_RSS_FRACTION = 0.5         # max share of physical RAM a config may use
+MIN_IMPROVEMENT = 0.05         # a candidate must beat the current choice by 5% to replace it
+
+# -------------------------------
+# FIXED PROMPT SET
+# (same shape as rag_pipeline.build_prompt, sized like real trimmed prompts)
+# -------------------------------
+_CONTEXT_SNIPPETS = [
+    "[med] source:medicine | row:12\nName: Metformin 500mg Tablet\nUses: Type 2 diabetes mellitus. "
+    "Metformin lowers glucose production in the liver and improves insulin sensitivity.",
+    "[lab] source:labtest | parameter:HbA1c | category:Diabetes\nHbA1c (Diabetes)\nMale Range: 4.0-5.6 %\n"
+    "Female Range: 4.0-5.6 %\nInterpretation: Values of 6.5% or higher indicate diabetes.",
+    "[book] source:book | page:214\nHypertension is a chronic elevation of blood pressure. Lifestyle changes "
+    "such as reduced salt intake, regular exercise and weight loss are first-line measures.",
+    "[rem] source:remedy | row:3\nName of Item: Ginger\nHealth Issue: Nausea\nHome Remedy: Ginger tea "
+    "sipped slowly may ease mild nausea.",
+    "[lab] source:labtest | parameter:Hemoglobin | category:Hematology\nHemoglobin (Hematology)\n"
+    "Male Range: 13.5-17.5 g/dL\nFemale Range: 12.0-15.5 g/dL\nInterpretation: Low values suggest anemia.",
+]
+
+_QUESTIONS = [
+    "What is Metformin used for?",
+    "My HbA1c is 7.1%, what does that mean?",
+    "How can I lower my blood pressure naturally?",
+]
+
+_PROMPT_TEMPLATE = """
+You are a caring medical assistant.
+
+IMPORTANT:
+- ONLY answer the USER QUESTION at the bottom.
+- If the context lacks the specific information needed to answer, say: "I don't know."
+
+CONTEXT START
+{context}
+CONTEXT END
+
+USER QUESTION:
+{question}
+
+YOUR ANSWER:
+""".strip()
+
+
+def build_prompt_set(ctx: int) -> List[str]:
+    """Short / typical / full-length prompts; the last one is filled up to the pipeline's trim limit."""
+    limit = prompt_char_limit(ctx)
+    prompts = []
+    for n_snippets, question in zip((1, 3, None), _QUESTIONS):
+        if n_snippets is None:
+            snippets = []
+            while len("\n\n---\n\n".join(snippets)) < limit:
+                snippets.append(_CONTEXT_SNIPPETS[len(snippets) % len(_CONTEXT_SNIPPETS)])
+        else:
+            snippets = _CONTEXT_SNIPPETS[:n_snippets]
+        prompt = _PROMPT_TEMPLATE.format(context="\n\n---\n\n".join(snippets), question=question)
+        prompts.append(prompt[:limit])
+    return prompts
+
+
+def build_embed_corpus(n: int = 512) -> List[str]:
+    """
+    Texts shaped like what indexing.py embeds: half are short records (medicine /
+    remedy / lab rows), half are book pages long enough to hit MiniLM's 256-token limit.
+    """
+    texts = []
+    for i in range(n):
+        if i % 2 == 0:
+            texts.append(_CONTEXT_SNIPPETS[(i // 2) % len(_CONTEXT_SNIPPETS)])
+        else:
+            page_chars = 1200 + (i * 37) % 1800  # 1200-3000 chars, like ingestion.load_pdf pages
+            page = []
+            while len("\n".join(page)) < page_chars:
+                page.append(_CONTEXT_SNIPPETS[(i + len(page)) % len(_CONTEXT_SNIPPETS)])
+            texts.append("\n".join(page)[:page_chars])
+    return texts
+
+# -------------------------------
+# HOST INFO
+# -------------------------------
+def _cpu_name() -> str:
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.startswith("model name"):
+                        return line.split(":", 1)[1].strip()
+        except OSError:
+            pass
+    return platform.processor() or platform.machine()
+
+
+def usable_cpus() -> int:
+    """CPUs this process may actually run on (affinity mask, capped by a cgroup v2 CPU quota)."""
+    try:
+        n = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on Windows / macOS
+        n = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max", "r", encoding="utf-8") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            n = min(n, max(1, -(-int(quota) // int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, n)
+
+
+def host_fingerprint() -> Dict[str, Any]:
+    return {
+        "hostname": platform.node(),
+        "cpu": _cpu_name(),
+        "usable_cpus": usable_cpus(),
+        "machine": platform.machine(),
+    }
+
+
+def _same_cpu(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    # hostname is informational only: identical machines may share a profile
+    return all(a.get(k) == b.get(k) for k in ("cpu", "usable_cpus", "machine"))
+
+
+def _total_ram_mb() -> Optional[float]:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        pass
+    try:
+        import psutil
+        return psutil.virtual_memory().total / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, KiB on Linux
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+# -------------------------------
+# PROFILE LOAD (used by rag_pipeline / indexing at startup)
+# -------------------------------
+def default_host_profile(model_path: str = MODEL_PATH, embed_model: str = EMBED_MODEL) -> Dict[str, Any]:
+    return {
+        "llm": {
+            "model_path": model_path,
+            "context_window": DEFAULT_CONTEXT_WINDOW,
+            "max_new_tokens": DEFAULT_MAX_NEW_TOKENS,
+            "model_kwargs": {},
+        },
+        "embedding": {"model": embed_model, "batch_size": None},
+    }
+
+
+def _is_pos_int(v: Any) -> bool:
+    return isinstance(v, int) and not isinstance(v, bool) and v > 0
+
+
+def _profile_shape_error(saved: Any) -> Optional[str]:
+    """Describe what is wrong with a parsed profile, or None if it has the shape autotune.py writes."""
+    if not isinstance(saved, dict):
+        return "top level is not an object"
+    if not isinstance(saved.get("host"), dict):
+        return "'host' is not an object"
+    llm_cfg = saved.get("llm", {})
+    if not isinstance(llm_cfg, dict):
+        return "'llm' is not an object"
+    if llm_cfg:
+        if not isinstance(llm_cfg.get("model_kwargs"), dict):
+            return "'llm.model_kwargs' is not an object"
+        for key in ("context_window", "max_new_tokens"):
+            if not _is_pos_int(llm_cfg.get(key)):
+                return f"'llm.{key}' is not a positive integer"
+    emb_cfg = saved.get("embedding", {})
+    if not isinstance(emb_cfg, dict):
+        return "'embedding' is not an object"
+    if emb_cfg and not _is_pos_int(emb_cfg.get("batch_size")):
+        return "'embedding.batch_size' is not a positive integer"
+    return None
+
+
+def load_host_profile(path: str = HOST_PROFILE_PATH, model_path: str = MODEL_PATH,
+                      embed_model: str = EMBED_MODEL) -> Dict[str, Any]:
+    """
+    Load the autotuned profile for this host. Falls back to the built-in defaults
+    (section by section) if the file is missing, was tuned on a different CPU,
+    was tuned for a different model, or is malformed.
+    """
+    profile = default_host_profile(model_path, embed_model)
+    if not os.path.exists(path):
+        return profile
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+    except Exception as e:
+        print(f"[WARN] Could not read host profile {path}: {e}")
+        return profile
+    error = _profile_shape_error(saved)
+    if error:
+        print(f"[WARN] Ignoring malformed host profile {path} ({error}); using defaults. Re-run autotune.py.")
+        return profile
+
+    if not _same_cpu(saved["host"], host_fingerprint()):
+        print(f"[WARN] Host profile {path} was tuned on a different CPU; using defaults. Re-run autotune.py.")
+        return profile
+
+    llm_cfg = saved.get("llm") or {}
+    if llm_cfg.get("model_path") == model_path:
+        profile["llm"].update(llm_cfg)
+    elif llm_cfg:
+        print(f"[WARN] Host profile LLM settings are for {llm_cfg.get('model_path')}; using defaults.")
+
+    emb_cfg = saved.get("embedding") or {}
+    if emb_cfg.get("model") == embed_model:
+        profile["embedding"].update(emb_cfg)
+    elif emb_cfg:
+        print(f"[WARN] Host profile embedding settings are for {emb_cfg.get('model')}; using defaults.")
+
+    print(f"✅ Loaded host profile {path} (tuned {saved.get('created', '?')})")
+    return profile
+
+# -------------------------------
+# TRIAL WORKERS (run in a fresh spawned process each)
+# -------------------------------
+def _time_prompt(llm, prompt: str, max_tokens: int) -> Dict[str, Any]:
+    n_prompt = len(llm.tokenize(prompt.encode("utf-8")))
+    llm.reset()  # drop cached prefix so every run pays the full prefill
+    t0 = time.perf_counter()
+    t_first = None
+    n_out = 0
+    for _ in llm.create_completion(prompt, max_tokens=max_tokens, temperature=0.0, stream=True,
+                                   logit_bias={llm.token_eos(): -100.0}):
+        n_out += 1
+        if t_first is None:
+            t_first = time.perf_counter()
+    t_end = time.perf_counter()
+    t_first = t_first or t_end
+    return {
+        "prompt_tokens": n_prompt,
+        "prompt_chars": len(prompt),
+        "prefill_s": t_first - t0,
+        "prefill_tps": n_prompt / max(t_first - t0, 1e-9),
+        "decode_tps": (n_out - 1) / max(t_end - t_first, 1e-9) if n_out > 1 else None,
+    }
+
+
+def _llm_trial(model_path: str, config: Dict[str, Any], prompts: List[str], repeats: int) -> Dict[str, Any]:
+    from llama_cpp import Llama
+
+    kwargs = dict(config)
+    n_ctx = kwargs.pop("context_window")
+    t0 = time.perf_counter()
+    llm = Llama(model_path=model_path, n_ctx=n_ctx, verbose=False, **kwargs)
+    load_s = time.perf_counter() - t0
+
+    _time_prompt(llm, prompts[0], 4)  # warmup
+    runs = [_time_prompt(llm, p, DECODE_TOKENS) for _ in range(repeats) for p in prompts]
+    full = runs[len(prompts) - 1::len(prompts)]  # the full-length prompt of every repeat
+    decode = [r["decode_tps"] for r in runs if r["decode_tps"]]
+    return {
+        "load_s": load_s,
+        "prefill_tps": statistics.median(r["prefill_tps"] for r in runs),
+        "decode_tps": statistics.median(decode) if decode else 0.0,
+        "prompt_tokens": statistics.mean(r["prompt_tokens"] for r in runs),
+        "full_prompt_tokens": full[0]["prompt_tokens"],
+        "full_prompt_prefill_s": statistics.median(r["prefill_s"] for r in full),
+        "n_ctx_train": llm.n_ctx_train(),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _embed_trial(model_name: str, batch_size: int, texts: List[str], repeats: int) -> Dict[str, Any]:
+    from sentence_transformers import SentenceTransformer
+
+    embedder = SentenceTransformer(model_name, cache_folder="emb_cache")
+    embedder.encode(texts[:batch_size], batch_size=batch_size)  # warmup
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        embedder.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+        times.append(time.perf_counter() - t0)
+    return {
+        "sentences_per_s": len(texts) / statistics.median(times),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _run_trial(fn, *args) -> Dict[str, Any]:
+    # spawn (not fork) so each trial starts clean and ru_maxrss is per-config
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            return pool.submit(fn, *args).result()
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+# -------------------------------
+# SCORING
+# -------------------------------
+def _request_seconds(m: Dict[str, Any]) -> float:
+    """Estimated wall time for one answer; lower is better."""
+    if "error" in m or not m.get("prefill_tps") or not m.get("decode_tps"):
+        return float("inf")
+    return m["prompt_tokens"] / m["prefill_tps"] + REFERENCE_ANSWER_TOKENS / m["decode_tps"]
+
+
+def _fits_ram(m: Dict[str, Any], ram_mb: Optional[float]) -> bool:
+    return not (ram_mb and m.get("peak_rss_mb") and m["peak_rss_mb"] > ram_mb * MAX_RSS_FRACTION)
+
+
+def _fmt(m: Dict[str, Any]) -> str:
+    if "error" in m:
+        return f"FAILED ({m['error']})"
+    out = f"prefill {m['prefill_tps']:.1f} tok/s | decode {m['decode_tps']:.1f} tok/s"
+    if m.get("peak_rss_mb") is not None:
+        out += f" | rss {m['peak_rss_mb']:.0f} MB"
+    return out + f" | ~{_request_seconds(m):.1f}s/answer"
+
+# -------------------------------
+# SWEEPS
+# -------------------------------
+def _thread_candidates(cpus: int) -> List[int]:
+    return sorted({max(1, cpus // 4), max(1, cpus // 2), max(1, cpus * 3 // 4), cpus})
+
+
+def tune_llm(model_path: str, repeats: int, latency_budget: Optional[float], max_new_tokens_cap: int,
+             context_windows: List[int]) -> Dict[str, Any]:
+    cpus = usable_cpus()
+    trials: List[Dict[str, Any]] = []
+    cache: Dict[str, Dict[str, Any]] = {}
+
+    def measure(config: Dict[str, Any]) -> Dict[str, Any]:
+        key = json.dumps(config, sort_keys=True)
+        if key not in cache:
+            prompts = build_prompt_set(config["context_window"])
+            m = _run_trial(_llm_trial, model_path, config, prompts, repeats)
+            print(f"  {config} -> {_fmt(m)}")
+            cache[key] = m
+            trials.append({"config": config, **m})
+        return cache[key]
+
+    # llama.cpp's own defaults, made explicit (but sized to the CPUs we may use)
+    best = {
+        "context_window": DEFAULT_CONTEXT_WINDOW,
+        "n_threads": max(1, cpus // 2),
+        "n_threads_batch": cpus,
+        "n_batch": 512,
+        "use_mmap": True,
+        "use_mlock": False,
+    }
+    threads = _thread_candidates(cpus)
+    ram_mb = _total_ram_mb()
+    # coordinate descent: tune one knob at a time, keeping the best of the others.
+    # Only switch away from the current value on a clear win so reruns on one host agree.
+    space = [
+        ("n_threads", [{"n_threads": t} for t in threads]),
+        ("n_threads_batch", [{"n_threads_batch": t} for t in threads]),
+        ("n_batch", [{"n_batch": b} for b in N_BATCH_CANDIDATES]),
+    ]
+    print(f"\n[INFO] Baseline: {best}")
+    baseline = measure(best)
+    if "error" in baseline:
+        raise RuntimeError(f"Baseline llama.cpp trial failed: {baseline['error']}")
+    for name, candidates in space:
+        print(f"\n[INFO] Sweeping {name}")
+        best_s = _request_seconds(measure(best))
+        for c in candidates:
+            config = {**best, **c}
+            seconds = _request_seconds(measure(config))
+            if seconds < best_s * (1 - MIN_IMPROVEMENT):
+                best, best_s = config, seconds
+
+    # mmap/mlock barely change inference speed; they change load time and memory
+    # (use_mmap=False gives every process a private copy, use_mlock pins it), so rank on those
+    print("\n[INFO] Sweeping mmap/mlock (ranked by load time and peak RSS)")
+    current = measure(best)
+    for c in ({"use_mmap": False, "use_mlock": False}, {"use_mmap": True, "use_mlock": True}):
+        config = {**best, **c}
+        m = measure(config)
+        if "error" in m or not _fits_ram(m, ram_mb):
+            continue
+        faster_load = m["load_s"] < current["load_s"] * (1 - MIN_IMPROVEMENT)
+        rss_ok = (m.get("peak_rss_mb") or 0) <= (current.get("peak_rss_mb") or 0) * (1 + MIN_IMPROVEMENT)
+        if faster_load and rss_ok:
+            best, current = config, m
+    best_metrics = measure(best)
+
+    def answer_seconds(m: Dict[str, Any], new_tokens: int) -> float:
+        return m["full_prompt_prefill_s"] + new_tokens / max(m["decode_tps"], 1e-9)
+
+    # context window: a larger window means longer prompts (slower answers), so only grow it
+    # when the user gave a latency budget and a full-length answer still fits in it
+    chosen_ctx, chosen_metrics = best["context_window"], best_metrics
+    if latency_budget is None:
+        print(f"\n[INFO] Keeping context_window={chosen_ctx} (pass --latency-budget to consider larger windows)")
+    else:
+        print("\n[INFO] Sweeping context_window")
+        n_ctx_train = best_metrics.get("n_ctx_train") or max(context_windows)
+        for ctx in sorted(c for c in context_windows if c > chosen_ctx):
+            if ctx > n_ctx_train:
+                print(f"  context_window={ctx} skipped (model trained on {n_ctx_train})")
+                continue
+            m = measure({**best, "context_window": ctx})
+            if "error" in m:
+                continue
+            if not _fits_ram(m, ram_mb):
+                print(f"  context_window={ctx} exceeds RAM budget ({m['peak_rss_mb']:.0f} MB)")
+                continue
+            if answer_seconds(m, max_new_tokens_cap) > latency_budget:
+                print(f"  context_window={ctx} too slow for {latency_budget:.0f}s budget "
+                      f"(~{answer_seconds(m, max_new_tokens_cap):.0f}s per full-length answer)")
+                continue
+            chosen_ctx, chosen_metrics = ctx, m
+    best["context_window"] = chosen_ctx
+
+    # max_new_tokens: keep the pipeline's answer length; only an explicit budget may shorten it
+    max_new = min(max_new_tokens_cap, chosen_ctx - chosen_metrics["full_prompt_tokens"])
+    if latency_budget is not None and answer_seconds(chosen_metrics, max_new) > latency_budget:
+        remaining_s = latency_budget - chosen_metrics["full_prompt_prefill_s"]
+        budget_tokens = max(MIN_NEW_TOKENS, int(remaining_s * chosen_metrics["decode_tps"]) // 64 * 64)
+        if budget_tokens < max_new:
+            print(f"[WARN] --latency-budget {latency_budget:.0f}s lowers max_new_tokens from {max_new} to "
+                  f"{budget_tokens} (decode {chosen_metrics['decode_tps']:.1f} tok/s); long answers will be cut off.")
+            max_new = budget_tokens
+
+    context_window = best.pop("context_window")
+    return {
+        "llm": {
+            "model_path": model_path,
+            "context_window": context_window,
+            "max_new_tokens": max_new,
+            "model_kwargs": best,
+        },
+        "metrics": {k: chosen_metrics.get(k) for k in ("prefill_tps", "decode_tps", "full_prompt_prefill_s",
+                                                       "peak_rss_mb", "load_s")},
+        "trials": trials,
+    }
+
+
+def tune_embedding(model_name: str, repeats: int) -> Dict[str, Any]:
+    texts = build_embed_corpus()
+    ram_mb = _total_ram_mb()
+    trials = []
+    print(f"\n[INFO] Sweeping embedding batch_size ({len(texts)} records and book pages)")
+    for bs in EMBED_BATCH_CANDIDATES:
+        m = _run_trial(_embed_trial, model_name, bs, texts, repeats)
+        if "error" in m:
+            print(f"  batch_size={bs} -> FAILED ({m['error']})")
+        else:
+            rss = m.get("peak_rss_mb")
+            print(f"  batch_size={bs} -> {m['sentences_per_s']:.1f} sent/s"
+                  + (f" | rss {rss:.0f} MB" if rss is not None else "")
+                  + ("" if _fits_ram(m, ram_mb) else " (exceeds RAM budget)"))
+        trials.append({"batch_size": bs, **m})
+    ok = [t for t in trials if "error" not in t and _fits_ram(t, ram_mb)]
+    if not ok:
+        raise RuntimeError("No embedding batch size ran within the RAM budget")
+    # smallest batch first; a larger one must be clearly faster to replace it
+    best = ok[0]
+    for t in ok[1:]:
+        if t["sentences_per_s"] > best["sentences_per_s"] * (1 + MIN_IMPROVEMENT):
+            best = t
+    return {
+        "embedding": {"model": model_name, "batch_size": best["batch_size"]},
+        "metrics": {"sentences_per_s": best["sentences_per_s"], "peak_rss_mb": best.get("peak_rss_mb")},
+        "trials": trials,
+    }
+
+# -------------------------------
+# CLI
+# -------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Autotune llama.cpp and embedding settings for this host")
+    parser.add_argument("--model", default=MODEL_PATH, help="GGUF model to tune for")
+    parser.add_argument("--embed-model", default=EMBED_MODEL, help="SentenceTransformer model to tune for")
+    parser.add_argument("--out", default=HOST_PROFILE_PATH, help="Where to write the host profile")
+    parser.add_argument("--repeats", type=int, default=2, help="Timed passes over the prompt set per trial")
+    parser.add_argument("--latency-budget", type=float, default=None,
+                        help="Target seconds per full-length answer. Allows larger context windows that fit "
+                             "it and may lower max_new_tokens (with a warning). Default: no budget")
+    parser.add_argument("--max-new-tokens", type=int, default=DEFAULT_MAX_NEW_TOKENS,
+                        help="Upper bound for the tuned max_new_tokens")
+    parser.add_argument("--context-windows", default=",".join(map(str, CONTEXT_WINDOW_CANDIDATES)),
+                        help="Comma-separated context window candidates")
+    args = parser.parse_args()
+
+    host = host_fingerprint()
+    print(f"[INFO] Tuning on {host['hostname']}: {host['cpu']} ({host['usable_cpus']} usable CPUs)")
+    start = time.time()
+
+    llm_result = tune_llm(args.model, args.repeats, args.latency_budget, args.max_new_tokens,
+                          [int(c) for c in args.context_windows.split(",") if c.strip()])
+    emb_result = tune_embedding(args.embed_model, args.repeats)
+
+    profile = {
+        "host": host,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "llm": llm_result["llm"],
+        "embedding": emb_result["embedding"],
+        "measurements": {
+            "llm": llm_result["metrics"],
+            "embedding": emb_result["metrics"],
+            "llm_trials": llm_result["trials"],
+            "embedding_trials": emb_result["trials"],
+        },
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+
+    print(f"\n✔ Autotune finished in {time.time() - start:.0f}s → {args.out}")
+    print(f"  llm:       {profile['llm']}")
+    print(f"  embedding: {profile['embedding']}")
+
+
+if __name__ == "__main__":
+    main()
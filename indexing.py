@@ -5,8 +5,12 @@ from sentence_transformers import SentenceTransformer
 import numpy as np
 from chromadb import PersistentClient   # NEW client
 
+from autotune import load_host_profile
+
 BATCH_SIZE = 512
 MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+# encode batch size tuned for this host by `python autotune.py` (falls back to BATCH_SIZE)
+EMBED_BATCH_SIZE = load_host_profile(embed_model=MODEL_NAME)["embedding"]["batch_size"] or BATCH_SIZE
 
 RAW_PATH = Path("output/chroma_raw.json")
 CHROMA_DIR = Path("chroma_db")
@@ -28,7 +32,7 @@ def index_collection(client, name, items, embedder):
         metas = [x["metadata"] for x in batch]
 
         # batch embedding
-        embeds = embedder.encode(texts, batch_size=BATCH_SIZE, convert_to_numpy=True)
+        embeds = embedder.encode(texts, batch_size=EMBED_BATCH_SIZE, convert_to_numpy=True)
 
         coll.add(
             ids=ids,
@@ -0,0 +1,13 @@
+# prompt_config.py
+"""
+Prompt sizing shared by rag_pipeline.py (trims prompts to fit the context window)
+and autotune.py (sizes its test prompts the same way). Kept in its own module so
+autotune.py can use it without importing rag_pipeline, which loads the models.
+"""
+MAX_PROMPT_CHARS_RATIO = 0.25
+# MAX_PROMPT_CHARS_RATIO = 0.5
+
+
+def prompt_char_limit(ctx: int, ratio: float = MAX_PROMPT_CHARS_RATIO) -> int:
+    """Max prompt length in chars for a context window of `ctx` tokens."""
+    return max(1024, int(ctx * ratio * 3))
@@ -25,6 +25,9 @@ from sentence_transformers import SentenceTransformer
 
 from llama_index.llms.llama_cpp import LlamaCPP
 
+from autotune import load_host_profile
+from prompt_config import MAX_PROMPT_CHARS_RATIO, prompt_char_limit
+
 # -------------------------------
 # CONFIG
 # -------------------------------
@@ -38,8 +41,7 @@ TOP_K_PER_COLLECTION = 3
 FINAL_TOP_K = 4
 PDF_PAGE_CHAR_LIMIT = 700
 SUMMARIZE_SNIPPET_CHARS = 120
-MAX_PROMPT_CHARS_RATIO = 0.25
-# MAX_PROMPT_CHARS_RATIO = 0.5
+# MAX_PROMPT_CHARS_RATIO lives in prompt_config.py (shared with autotune.py)
 # PDF_PAGE_CHAR_LIMIT = 4000
 # SUMMARIZE_SNIPPET_CHARS = 300   # how much of each doc to include
 MIN_AUTHORITATIVE_SOURCES = {"med", "book"}  # require at least one of these for treatment/dosage Qs
@@ -50,14 +52,18 @@ pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tessera
 # -------------------------------
 # MODELS / CLIENTS
 # -------------------------------
+# Per-host llama.cpp / embedding settings written by `python autotune.py`
+# (defaults: context_window=2048, max_new_tokens=512, llama.cpp thread/batch defaults)
+HOST_PROFILE = load_host_profile(model_path=MODEL_PATH, embed_model=EMBED_MODEL)
+
 embedder = SentenceTransformer(EMBED_MODEL, cache_folder="emb_cache")
 
 llm = LlamaCPP(
     model_path=MODEL_PATH,
-    context_window=2048,   # <-- correct
-    # n_ctx=4096,  
+    context_window=HOST_PROFILE["llm"]["context_window"],
     temperature=0.1,  # friendly but factual
-    max_new_tokens=512,
+    max_new_tokens=HOST_PROFILE["llm"]["max_new_tokens"],
+    model_kwargs=dict(HOST_PROFILE["llm"]["model_kwargs"]),  # n_threads, n_batch, use_mmap, ...
     verbose=False,
 )
 
@@ -365,7 +371,7 @@ def query_rag(question: str, pdf_path: str = None) -> str:
         ctx = int(ctx)
     except Exception:
         ctx = 2048
-    prompt_limit = max(1024, int(ctx * MAX_PROMPT_CHARS_RATIO * 3))
+    prompt_limit = prompt_char_limit(ctx, MAX_PROMPT_CHARS_RATIO)
     prompt = safe_trim(prompt, prompt_limit)
 
     # Call LLM